@@ -442,6 +442,10 @@ class Cfg(metaclass=Singleton):
     def vmaf_repo_path(self, value: Union[str, Path]):
         self._vmaf_repo_path = value
 
+    vmaf_threads: Union[int, None] = None
+    """The number of threads libvmaf uses when computing VMAF for one encoding.
+    None leaves it to the ffmpeg default. Requires ffmpeg 4.1 or newer if set."""
+
     ##########################################################################
     # VTM
     ##########################################################################
@@ -1,6 +1,9 @@
 """This module defines functionality related to generating the CSV output file."""
 
+from __future__ import annotations
+
 import math
+from collections import namedtuple
 from enum import Enum
 from pathlib import Path
 from typing import Union
@@ -11,8 +14,9 @@ from tester.core.metrics import SequenceMetrics
 
 
 def csv_validate_config():
+    csv_field_names = cfg.Cfg().csv_field_names
     for field in cfg.Cfg().csv_enabled_fields:
-        if not field in cfg.Cfg().csv_field_names.keys():
+        if field not in csv_field_names:
             console_log.error(f"CSV: Field '{field}' is enabled but does not have a name")
             raise RuntimeError
 
@@ -111,6 +115,76 @@ class CsvField(Enum):
         return value in cls._value2member_map_
 
 
+# The metric fields that exist for each base type. Resolved once since CsvField raises
+# ValueError for the combinations that do not exist.
+_METRIC_FIELDS = [
+    (CsvField(base_type | value_type), value_type, str(base_type))
+    for base_type in CsvFieldBaseType
+    for value_type in CsvFieldValueType
+    if CsvField.has_value(base_type | value_type)
+]
+
+
+# The values a CSV row is built from, passed to the value extractors below.
+_CsvRow = namedtuple("_CsvRow", (
+    "test",
+    "subtest",
+    "anchor",
+    "anchor_subtest",
+    "sequence",
+    "sequence_metric",
+    "anchor_seq",
+    "metric",
+    "anchor_metric",
+))
+
+# CSV field -> function(csv file, row) returning the value of the field. Only the
+# functions of the enabled fields are called.
+_VALUES_BY_FIELD = {
+    CsvField.SEQUENCE_NAME: lambda file, row: row.sequence.get_filepath().name,
+    CsvField.SEQUENCE_CLASS: lambda file, row: row.sequence.get_sequence_class(),
+    CsvField.SEQUENCE_FRAMECOUNT: lambda file, row: row.sequence.get_framecount(),
+    CsvField.ENCODER_NAME: lambda file, row: row.test.encoder.get_pretty_name(),
+    CsvField.ENCODER_REVISION: lambda file, row: row.test.encoder.get_short_revision(),
+    CsvField.ENCODER_DEFINES: lambda file, row: row.test.encoder.get_defines(),
+    CsvField.ENCODER_CMDLINE: lambda file, row: row.subtest.param_set.to_cmdline_str(),
+    CsvField.QUALITY_PARAM_NAME: lambda file, row: row.subtest.param_set.get_quality_param_type().pretty_name,
+    CsvField.QUALITY_PARAM_VALUE: lambda file, row: row.subtest.param_set.get_quality_param_value()
+    if "target_bitrate_avg" not in row.metric
+    else row.metric["target_bitrate_avg"],
+    CsvField.CONFIG_NAME: lambda file, row: row.test.name,
+    CsvField.ANCHOR_NAME: lambda file, row: row.anchor.name,
+
+    CsvField.BITRATE_ERROR: lambda file, row: -1 + row.metric["bitrate_avg"] / row.metric[
+        "target_bitrate_avg"] if "target_bitrate_avg" in row.metric else "-",
+
+    CsvField.CONFORMANCE: lambda file, row: row.metric["conforms_avg"],
+}
+
+for _field, _value_type, _name in _METRIC_FIELDS:
+    if _value_type == CsvFieldValueType.VALUE:
+        _VALUES_BY_FIELD[_field] = lambda file, row, name=_name: row.metric[name + "_avg"]
+    elif _value_type == CsvFieldValueType.STDEV:
+        _VALUES_BY_FIELD[_field] = lambda file, row, name=_name: row.metric[name + "_stdev"]
+    elif _value_type == CsvFieldValueType.COMPARISON:
+        _VALUES_BY_FIELD[_field] = \
+            lambda file, row, name=_name: file.compare(row, "compare_to_anchor", name)
+    elif _value_type == CsvFieldValueType.CROSSINGS:
+        _VALUES_BY_FIELD[_field] = \
+            lambda file, row, name=_name: file.compare(row, "rd_curve_crossings", name)
+    elif _value_type == CsvFieldValueType.OVERLAP:
+        _VALUES_BY_FIELD[_field] = \
+            lambda file, row, name=_name: file.compare(row, "metric_overlap", name)
+    elif _value_type == CsvFieldValueType.COMPARISON2:
+        _VALUES_BY_FIELD[_field] = \
+            lambda file, row, name=_name: file.compare(row, "compare_to_anchor", name + "-bddistortion")
+
+del _field, _value_type, _name
+
+_VALUES_BY_FIELD[CsvField.ITEM_WISE_SPEEDUP] = \
+    lambda file, row: row.anchor_metric["encoding_time_avg"] / row.metric["encoding_time_avg"]
+
+
 class CsvFile:
     """Represents the tester output CSV file."""
 
@@ -119,8 +193,7 @@ class CsvFile:
         self._filepath: Path = filepath
 
         # Create the new CSV file.
-        if not Path(self._filepath.parent).exists():
-            Path(self._filepath.parent).mkdir(parents=True, exist_ok=True)
+        self._filepath.parent.mkdir(parents=True, exist_ok=True)
         with self._filepath.open("w") as file:
             # Create the header.
             header_row = ""
@@ -129,85 +202,42 @@ class CsvFile:
                 header_row += cfg.Cfg().csv_field_delimiter
             file.write(header_row + "\n")
 
+        # The rows are buffered and written with a single write in flush().
+        self._rows: list = []
+        # (sequence metrics, anchor sequence metrics, method, name) -> comparison
+        self._comparisons: dict = {}
+
     def add_entry(self, metrics, test, subtest, anchor, anchor_subtest, sequence) -> None:
 
-        metric = metrics[test.name][sequence][subtest.param_set.get_quality_param_value()]
-        anchor_metric = metrics[anchor.name][sequence][anchor_subtest.param_set.get_quality_param_value()]
         sequence_metric: SequenceMetrics = metrics[test.name][sequence]
         anchor_seq: SequenceMetrics = metrics[anchor.name][sequence]
-
-        values_by_field = {
-            CsvField.SEQUENCE_NAME: lambda: sequence.get_filepath().name,
-            CsvField.SEQUENCE_CLASS: lambda: sequence.get_sequence_class(),
-            CsvField.SEQUENCE_FRAMECOUNT: lambda: sequence.get_framecount(),
-            CsvField.ENCODER_NAME: lambda: test.encoder.get_pretty_name(),
-            CsvField.ENCODER_REVISION: lambda: test.encoder.get_short_revision(),
-            CsvField.ENCODER_DEFINES: lambda: test.encoder.get_defines(),
-            CsvField.ENCODER_CMDLINE: lambda: subtest.param_set.to_cmdline_str(),
-            CsvField.QUALITY_PARAM_NAME: lambda: subtest.param_set.get_quality_param_type().pretty_name,
-            CsvField.QUALITY_PARAM_VALUE: lambda: subtest.param_set.get_quality_param_value()
-            if "target_bitrate_avg" not in metric
-            else metric["target_bitrate_avg"],
-            CsvField.CONFIG_NAME: lambda: test.name,
-            CsvField.ANCHOR_NAME: lambda: anchor.name,
-
-            CsvField.BITRATE_ERROR: lambda: -1 + metric["bitrate_avg"] / metric[
-                "target_bitrate_avg"] if "target_bitrate_avg" in metric else "-",
-
-            CsvField.CONFORMANCE: lambda: metric["conforms_avg"],
-        }
-
-        # TODO: Find a way to make this cleaner
-        for base_type in CsvFieldBaseType:
-            try:
-                values_by_field[CsvField(base_type | CsvFieldValueType.VALUE)] = \
-                    lambda base_type=base_type: metric[str(base_type) + "_avg"]
-            except ValueError:
-                pass
-
-            try:
-                values_by_field[CsvField(base_type | CsvFieldValueType.STDEV)] = \
-                    lambda base_type=base_type: metric[str(base_type) + "_stdev"]
-            except ValueError:
-                pass
-
-            try:
-                values_by_field[CsvField(base_type | CsvFieldValueType.COMPARISON)] = \
-                    lambda base_type=base_type: sequence_metric.compare_to_anchor(anchor_seq, str(base_type))
-            except ValueError:
-                pass
-
-            try:
-                values_by_field[CsvField(base_type | CsvFieldValueType.CROSSINGS)] = \
-                    lambda base_type=base_type: sequence_metric.rd_curve_crossings(anchor_seq, str(base_type))
-            except ValueError:
-                pass
-
-            try:
-                values_by_field[CsvField(base_type | CsvFieldValueType.OVERLAP)] = \
-                    lambda base_type=base_type: sequence_metric.metric_overlap(anchor_seq, str(base_type))
-            except ValueError:
-                pass
-            try:
-                values_by_field[CsvField(base_type | CsvFieldValueType.COMPARISON2)] = \
-                    lambda base_type=base_type: sequence_metric.compare_to_anchor(anchor_seq, str(base_type)+"-bddistortion")
-            except ValueError:
-                pass
-
-        values_by_field[CsvField.ITEM_WISE_SPEEDUP] = \
-            lambda: anchor_metric["encoding_time_avg"] / metric["encoding_time_avg"]
+        row = _CsvRow(
+            test,
+            subtest,
+            anchor,
+            anchor_subtest,
+            sequence,
+            sequence_metric,
+            anchor_seq,
+            sequence_metric[subtest.param_set.get_quality_param_value()],
+            anchor_seq[anchor_subtest.param_set.get_quality_param_value()],
+        )
+
+        config = cfg.Cfg()
+        float_rounding_accuracy = config.csv_float_rounding_accuracy
+        decimal_point = config.csv_decimal_point
 
         new_row = []
-        for field_id in cfg.Cfg().csv_enabled_fields:
-            value = values_by_field[field_id]()
+        for field_id in config.csv_enabled_fields:
+            value = _VALUES_BY_FIELD[field_id](self, row)
 
             if isinstance(value, float):
                 if math.isnan(value):
                     value = "-"
                 else:
                     # Round floats, use the configured decimal point character.
-                    value = round(value, cfg.Cfg().csv_float_rounding_accuracy)
-                    value = str(value).replace(".", cfg.Cfg().csv_decimal_point)
+                    value = round(value, float_rounding_accuracy)
+                    value = str(value).replace(".", decimal_point)
             else:
                 value = str(value)
 
@@ -219,5 +249,33 @@ class CsvFile:
 
             new_row.append(value)
 
+        self._rows.append(config.csv_field_delimiter.join(new_row) + "\n")
+
+    def compare(self,
+                row: _CsvRow,
+                method: str,
+                name: str):
+        """Returns the result of the given SequenceMetrics comparison to the anchor.
+        The comparisons only depend on the sequence, so they are shared by the rows of every subtest."""
+        key = (row.sequence_metric, row.anchor_seq, method, name)
+        try:
+            return self._comparisons[key]
+        except KeyError:
+            value = getattr(row.sequence_metric, method)(row.anchor_seq, name)
+            self._comparisons[key] = value
+            return value
+
+    def __enter__(self) -> CsvFile:
+        return self
+
+    def __exit__(self, *_) -> None:
+        # Also write the rows added before an error.
+        self.flush()
+
+    def flush(self) -> None:
+        """Appends the buffered rows to the file."""
+        if not self._rows:
+            return
         with self._filepath.open("a") as file:
-            file.write(cfg.Cfg().csv_field_delimiter.join(new_row) + "\n")
+            file.write("".join(self._rows))
+        self._rows.clear()
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 import re
 import shutil
 import subprocess
+import tempfile
 from pathlib import Path
 from typing import Dict
 
@@ -17,8 +19,6 @@ import tester.core.cfg as cfg
 from tester.core.log import console_log
 
 # Compile Regex patterns only once for better performance.
-from tester.core.system import pushd
-
 _PSNR_PATTERN: re.Pattern = re.compile(r".*psnr_avg:([0-9]+.[0-9]+|inf\s).*", re.DOTALL)
 _SSIM_PATTERN: re.Pattern = re.compile(r".*All:([0-9]+.[0-9]+).*", re.DOTALL)
 _VMAF_PATTERN: re.Pattern = re.compile(r".*\"VMAF score\":([0-9]+.[0-9]+).*", re.DOTALL)
@@ -55,7 +55,7 @@ def ffmpeg_validate_config():
 
 
 def copy_vmaf_models(test: tester.Test):
-    temp = test.encoder.get_output_dir(test.subtests[0].param_set, test.env)
+    temp = test.subtests[0].output_dir_path
     if (cfg.Cfg().vmaf_repo_path / "model" / "vmaf_v0.6.1.json").exists():
         shutil.copy(
             cfg.Cfg().vmaf_repo_path / "model" / "vmaf_v0.6.1.json",
@@ -73,7 +73,7 @@ def copy_vmaf_models(test: tester.Test):
 
 
 def remove_vmaf_models(test: tester.Test):
-    temp = test.encoder.get_output_dir(test.subtests[0].param_set, env=test.env)
+    temp = test.subtests[0].output_dir_path
     vmaf_model_dest_path1 = temp / f"vmaf_v0.6.1.{__vmaf_version}"
     vmaf_model_dest_path2 = temp / "vmaf_v0.6.1.pkl.model"
     try:
@@ -114,10 +114,12 @@ def compute_metrics(encoding_run: test.EncodingRun, metrics: list) -> Dict[str:
     if "vmaf" in metrics:
         split1 += "[yuv_vmaf]"
         split2 += "[hevc_vmaf]"
+        vmaf_threads = f":n_threads={cfg.Cfg().vmaf_threads}" if cfg.Cfg().vmaf_threads else ""
         filters.append(f"[hevc_vmaf][yuv_vmaf]"
                        f"libvmaf=model_path={vmaf_model}:"
                        f"log_path={logs['vmaf'].name}:"
-                       f"log_fmt=json")
+                       f"log_fmt=json"
+                       f"{vmaf_threads}")
 
     ffmpeg_filter = f"{split1}; " \
                     f"{split2}; " \
@@ -176,17 +178,21 @@ def compute_metrics(encoding_run: test.EncodingRun, metrics: list) -> Dict[str:
         )
 
     try:
-        console_log.debug(f"ffmpeg: Computing metrics")
-        console_log.debug(f"ffmpeg: Input 1: '{encoding_run.input_sequence.get_filepath().name}'")
-        console_log.debug(f"ffmpeg: Input 2: '{encoding_run.output_file.get_filepath().name}'")
-        for m in metrics:
-            console_log.debug(f"ffmpeg: {m.upper()} log: '{m}'")
-
-        with pushd(encoding_run.output_file.get_filepath().parent):
-            subprocess.check_output(
-                ffmpeg_command,
-                stderr=subprocess.STDOUT
-            )
+        if console_log.isEnabledFor(logging.DEBUG):
+            console_log.debug(f"ffmpeg: Computing metrics")
+            console_log.debug(f"ffmpeg: Input 1: '{encoding_run.input_sequence.get_filepath().name}'")
+            console_log.debug(f"ffmpeg: Input 2: '{encoding_run.output_file.get_filepath().name}'")
+            for m in metrics:
+                console_log.debug(f"ffmpeg: {m.upper()} log: '{m}'")
+
+        # The filter refers to the logs and the VMAF model by name, so run ffmpeg in the output directory.
+        # Passing the directory to the subprocess instead of changing the working directory of the
+        # tester makes it safe to compute metrics for several runs from different threads.
+        subprocess.check_output(
+            ffmpeg_command,
+            stderr=subprocess.STDOUT,
+            cwd=str(encoding_run.output_file.get_filepath().parent)
+        )
 
         if encoding_run.decoded_output_file_path:
             os.remove(encoding_run.decoded_output_file_path)
@@ -226,13 +232,15 @@ def compute_metrics(encoding_run: test.EncodingRun, metrics: list) -> Dict[str:
 
 
 def generate_dummy_sequence(resolution=16) -> Path:
-    dummy_sequence_path = cfg.Cfg().tester_sequences_dir_path / '_dummy.yuv'
-
-    console_log.debug(f"ffmpeg: Dummy sequence '{dummy_sequence_path}' already exists")
+    # Every call gets its own file since the dummy runs are done in parallel
+    # and the callers remove the sequence once they are done with it.
+    handle, dummy_sequence_path = tempfile.mkstemp(suffix=".yuv",
+                                                   prefix="_dummy",
+                                                   dir=str(cfg.Cfg().tester_sequences_dir_path))
+    os.close(handle)
+    dummy_sequence_path = Path(dummy_sequence_path)
 
-    if dummy_sequence_path.exists():
-        console_log.debug(f"ffmpeg: Generating dummy sequence '{dummy_sequence_path}'")
-        return dummy_sequence_path
+    console_log.debug(f"ffmpeg: Generating dummy sequence '{dummy_sequence_path}'")
 
     ffmpeg_cmd = (
         "ffmpeg",
@@ -241,6 +249,7 @@ def generate_dummy_sequence(resolution=16) -> Path:
         "-vframes", "60",
         "-pix_fmt", "yuv420p",
         "-f", "yuv4mpegpipe", str(dummy_sequence_path),
+        "-y",
     )
 
     try:
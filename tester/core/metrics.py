@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import itertools
 import json
+import os
 import statistics
 from pathlib import Path
 from typing import Iterable, Union
@@ -11,7 +13,7 @@ from vmaf.tools.bd_rate_calculator import BDrateCalculator
 import tester.core.test as test
 from tester.core.log import console_log
 from tester.core.video import VideoFileBase, RawVideoSequence
-from tester.encoders.base import QualityParam, EncoderBase
+from tester.encoders.base import QualityParam
 
 
 def bd_distortion(rate1, distortion1, rate2, distortion2):
@@ -108,20 +110,28 @@ def bdrint(y, x, low_x, high_x):
     return result
 
 
+# Metrics file path -> number of the latest write to it from this process.
+_write_numbers: dict = {}
+_write_counter = itertools.count()
+
+
 class EncodingRunMetrics:
     """
     Represents the data for a single encoding run
-    This is essentially stateless itself, since it always reads and writes from file
+    The file is the source of truth, it is parsed again whenever it has been written since the last read
     """
+    __slots__ = ("filepath", "_data", "_file_state")
 
     def __init__(self,
                  file_path: Path):
         self.filepath: Path = file_path
 
         self._data = {}
+        # The state of the file when it was last read or written, the file is only
+        # parsed again when it has been changed through some other object.
+        self._file_state: [tuple, None] = None
 
-        if self.filepath.exists():
-            self._read_in()
+        self._read_in()
 
     def __getitem__(self, item):
         self._read_in()
@@ -135,14 +145,30 @@ class EncodingRunMetrics:
     def _write_out(self) -> None:
         with self.filepath.open("w") as file:
             json.dump(self._data, file)
+        _write_numbers[str(self.filepath)] = next(_write_counter)
+        self._file_state = self._get_file_state()
 
     def _read_in(self) -> None:
+        file_state = self._get_file_state()
+        if file_state is None or file_state == self._file_state:
+            return
         try:
             with self.filepath.open("r") as file:
                 self._data = json.load(file)
+            self._file_state = file_state
         except FileNotFoundError:
             pass
 
+    def _get_file_state(self) -> [tuple, None]:
+        try:
+            stat = os.stat(self.filepath)
+        except FileNotFoundError:
+            return None
+        # The timestamps can be too coarse to tell writes apart, so the writes made from this
+        # process are numbered too.
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size,
+                _write_numbers.get(str(self.filepath)))
+
     def __contains__(self, item):
         self._read_in()
         return item in self._data
@@ -165,6 +191,8 @@ class EncodingQualityRunMetrics:
     Has all of the data for a single quality metric
     """
 
+    __slots__ = ("_rounds",)
+
     def __init__(self, rounds: int, base_path: Path):
         self._rounds = [EncodingRunMetrics(Path(str(base_path).format(x + 1))) for x in range(rounds)]
 
@@ -331,8 +359,7 @@ class SequenceMetrics:
 
 class TestMetrics:
     def __init__(self, test_instance: "Test", sequences):
-        encoder: EncoderBase = test_instance.encoder
-        base_path = encoder.get_output_dir(test_instance.subtests[0].param_set, test_instance.env)
+        base_path = test_instance.subtests[0].output_dir_path
 
         self.seq_data = {
             seq: SequenceMetrics(base_path,
@@ -1,6 +1,8 @@
 import subprocess
+from array import array
 from enum import Enum
 from collections import defaultdict
+from functools import partial
 from typing import List, Dict
 from math import isnan
 
@@ -140,8 +142,8 @@ def tablefy_one(context, test: Test, anchor: Test):
         '       <table>',
         table_header(),
     ]
-    class_averages = defaultdict(lambda: defaultdict(list))
-    total_averages = defaultdict(list)
+    class_averages = defaultdict(lambda: defaultdict(partial(array, "d")))
+    total_averages = defaultdict(partial(array, "d"))
     all_data = defaultdict(lambda: defaultdict(dict))
     collect_data(all_data, test, anchor, class_averages, context, total_averages)
     # calculate the height of the table based on the number of elements
@@ -201,26 +203,36 @@ def tablefy_one(context, test: Test, anchor: Test):
 def collect_data(all_data, test, anchor, class_averages, context, total_averages):
     sequences: List[RawVideoSequence] = context.get_input_sequences()
     metrics: Dict[str, met.TestMetrics] = context.get_metrics()
+    test_metrics = metrics[test.name]
+    anchor_metrics = metrics[anchor.name]
+    enabled_columns = cfg.Cfg().table_enabled_columns
+    averaged_columns = [m for m in enabled_columns if m != TableColumns.VIDEO]
+    # The append methods are bound once instead of for every value.
+    total_appends = [total_averages[m].append for m in averaged_columns]
+    class_appends = {}
     for sequence in sequences:
         c = sequence.get_sequence_class()
+        sequence_metrics = test_metrics[sequence]
+        anchor_sequence_metrics = anchor_metrics[sequence]
         actions = {
-            TableColumns.PSNR_BDBR: lambda: metrics[test.name][sequence].compare_to_anchor(
-                metrics[anchor.name][sequence], "psnr"),
-            TableColumns.SSIM_BDBR: lambda: metrics[test.name][sequence].compare_to_anchor(
-                metrics[anchor.name][sequence], "ssim"),
-            TableColumns.VMAF_BDBR: lambda: metrics[test.name][sequence].compare_to_anchor(
-                metrics[anchor.name][sequence], "vmaf"),
-            TableColumns.SPEEDUP: lambda: metrics[test.name][sequence].compare_to_anchor(
-                metrics[anchor.name][sequence], "encoding_time"),
+            TableColumns.PSNR_BDBR: lambda: sequence_metrics.compare_to_anchor(anchor_sequence_metrics, "psnr"),
+            TableColumns.SSIM_BDBR: lambda: sequence_metrics.compare_to_anchor(anchor_sequence_metrics, "ssim"),
+            TableColumns.VMAF_BDBR: lambda: sequence_metrics.compare_to_anchor(anchor_sequence_metrics, "vmaf"),
+            TableColumns.SPEEDUP: lambda: sequence_metrics.compare_to_anchor(anchor_sequence_metrics,
+                                                                             "encoding_time"),
             TableColumns.VIDEO: lambda: sequence.get_suffixless_name()
         }
-        for m in cfg.Cfg().table_enabled_columns:
-            temp = actions[m]()
-            all_data[c][sequence.get_suffixless_name()][m] = temp
-            if m == TableColumns.VIDEO:
-                continue
-            class_averages[c][m].append(temp)
-            total_averages[m].append(temp)
+        sequence_data = all_data[c][sequence.get_suffixless_name()]
+        appends = class_appends.get(c)
+        if appends is None:
+            appends = [class_averages[c][m].append for m in averaged_columns]
+            class_appends[c] = appends
+        for m in enabled_columns:
+            sequence_data[m] = actions[m]()
+        for m, class_append, total_append in zip(averaged_columns, appends, total_appends):
+            temp = sequence_data[m]
+            class_append(temp)
+            total_append(temp)
 
     for cls in class_averages:
         for m in cfg.Cfg().table_enabled_columns:
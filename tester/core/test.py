@@ -3,8 +3,6 @@
 from __future__ import annotations
 
 import os
-from hashlib import md5
-from math import sqrt
 from pathlib import Path
 from typing import Iterable
 
@@ -15,7 +13,56 @@ from tester.core.video import RawVideoSequence, EncodedVideoFile
 from tester.encoders.base import QualityParam
 
 
+def _scale_quality_param(quality_param_type: QualityParam,
+                         value,
+                         sequence: RawVideoSequence):
+    if quality_param_type == QualityParam.BPP:
+        return value * sequence.get_pixels_per_frame() * sequence.get_framerate()
+    elif quality_param_type == QualityParam.RES_SCALED_BITRATE:
+        return value * sequence.get_height() * sequence.get_width() / (1920 * 1080)
+    elif quality_param_type == QualityParam.RES_ROOT_SCALED_BITRATE:
+        return value * sequence.get_resolution_root_scale()
+    return value
+
+
+# Tests sharing an environment share the merged environment dict too. It is handed to
+# every subprocess of those tests, so the readers must not mutate it.
+_merged_envs: dict = {}
+
+
+def _merge_env(env: dict) -> dict:
+    # os.environ is part of the key so that changes made to it after the first test are picked up.
+    key = (tuple(sorted(env.items())), tuple(sorted(os.environ.items())))
+    merged_env = _merged_envs.get(key)
+    if merged_env is None:
+        merged_env = {**os.environ, **env}
+        _merged_envs[key] = merged_env
+    return merged_env
+
+
 class EncodingRun:
+    # There is an encoding run for every sequence, subtest and round so avoid the per-instance dict.
+    __slots__ = (
+        "env",
+        "parent",
+        "name",
+        "round_number",
+        "encoder",
+        "param_set",
+        "input_sequence",
+        "frames",
+        "qp_name",
+        "qp_value",
+        "base_filename",
+        "output_dir_path",
+        "_path_prefix",
+        "_metrics_path",
+        "_output_file",
+        "_input_filepath_str",
+        "_output_filepath_str",
+        "_hash",
+        "_metrics",
+    )
 
     def __init__(self,
                  parent: SubTest = None,
@@ -35,67 +82,99 @@ class EncodingRun:
         self.frames = param_set.get_frames() or input_sequence.get_framecount(seek=param_set.get_seek())
 
         self.qp_name = param_set.get_quality_param_type()
-        self.qp_value = param_set.get_quality_param_value()
-        if self.qp_name == QualityParam.BPP:
-            self.qp_value = self.qp_value * self.input_sequence._pixels_per_frame * self.input_sequence.get_framerate()
-        elif self.qp_name == QualityParam.RES_SCALED_BITRATE:
-            self.qp_value *= self.input_sequence.get_height() * self.input_sequence.get_width() / (1920 * 1080)
-        elif self.qp_name == QualityParam.RES_ROOT_SCALED_BITRATE:
-            self.qp_value *= sqrt(self.input_sequence.get_height() * self.input_sequence.get_width() / (1920 * 1080))
-
-        qp_name = self.qp_name.short_name
-
-        self.base_filename = f"{input_sequence.get_constructed_name()}_" \
-                             f"{qp_name}{self.param_set.get_quality_param_value()}_{round_number}"
-        self.output_dir_path = encoder.get_output_dir(param_set, parent.parent.env)
-
-        self.metrics_path: Path = self.output_dir_path / f"{self.base_filename}_metrics.json"
-
-        output_file_path: Path = self.output_dir_path / f"{self.base_filename}.{encoder.file_suffix}"
-        self.output_file = EncodedVideoFile(
-            filepath=output_file_path,
-            width=input_sequence.get_width(),
-            height=input_sequence.get_height(),
-            framerate=input_sequence.get_framerate(),
-            frames=self.frames,
-            duration_seconds=input_sequence.get_duration_seconds()
-        )
+        self.qp_value = parent.get_scaled_quality_param_value(input_sequence)
+
+        input_filepath = input_sequence.get_filepath()
+        base_filename_prefix = parent.get_base_filename_prefix(input_sequence)
+        self.base_filename = base_filename_prefix + str(round_number)
+        self.output_dir_path = parent.output_dir_path
+        # All the files of the run share this prefix, so build the paths from plain strings.
+        self._path_prefix: str = parent.get_path_prefix(input_sequence) + str(round_number)
+        self._metrics_path: [Path, None] = None
+
+        # These are only built when needed, creating the metrics reads the metrics file.
+        self._output_file: [EncodedVideoFile, None] = None
+        self._metrics: [met.EncodingRunMetrics, None] = None
+
+        # The paths are kept as strings, used for comparing and hashing runs,
+        # and only wrapped in Path objects when handed out.
+        self._input_filepath_str: str = str(input_filepath)
+        self._output_filepath_str: str = self._path_prefix + "." + encoder.file_suffix
+        self._hash: int = hash((input_filepath.name, os.path.basename(self._output_filepath_str)))
+
+        self.output_dir_path.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def output_file(self) -> EncodedVideoFile:
+        if self._output_file is None:
+            self._output_file = EncodedVideoFile(
+                filepath=Path(self._output_filepath_str),
+                width=self.input_sequence.get_width(),
+                height=self.input_sequence.get_height(),
+                framerate=self.input_sequence.get_framerate(),
+                frames=self.frames,
+                duration_seconds=self.input_sequence.get_duration_seconds()
+            )
+        return self._output_file
 
-        if not output_file_path.parent.exists():
-            output_file_path.parent.mkdir(parents=True)
+    @property
+    def metrics(self) -> met.EncodingRunMetrics:
+        if self._metrics is None:
+            self._metrics = met.EncodingRunMetrics(self.metrics_path)
+        return self._metrics
 
-        self.metrics = met.EncodingRunMetrics(self.metrics_path)
+    @property
+    def metrics_path(self) -> Path:
+        if self._metrics_path is None:
+            self._metrics_path = Path(self._path_prefix + "_metrics.json")
+        return self._metrics_path
 
-        self.decoded_output_file_path: [Path, None] = None
-        if encoder.file_suffix == "vvc":
-            self.decoded_output_file_path: Path = self.output_dir_path / f"{self.base_filename}_decoded.yuv"
+    @property
+    def decoded_output_file_path(self) -> [Path, None]:
+        if self.encoder.file_suffix == "vvc":
+            return Path(self._path_prefix + "_decoded.yuv")
+        return None
 
     @property
     def needs_encoding(self):
-        if cfg.Cfg().overwrite_encoding == cfg.ReEncoding.FORCE:
+        overwrite_encoding = cfg.Cfg().overwrite_encoding
+        if overwrite_encoding == cfg.ReEncoding.FORCE:
             return True
-        elif cfg.Cfg().overwrite_encoding == cfg.ReEncoding.SOFT:
-            return not self.output_file.get_filepath().exists() or "encoding_time" not in self.metrics
-        elif cfg.Cfg().overwrite_encoding == cfg.ReEncoding.OFF:
-            return (not self.output_file.get_filepath().exists() and not self.metrics.has_calculated_metrics) \
-                   or "encoding_time" not in self.metrics
+        # The metrics are checked before stat'ing the output file since a missing
+        # encoding time alone already decides the result.
+        elif overwrite_encoding == cfg.ReEncoding.SOFT:
+            return "encoding_time" not in self.metrics or not os.path.exists(self._output_filepath_str)
+        elif overwrite_encoding == cfg.ReEncoding.OFF:
+            return "encoding_time" not in self.metrics \
+                   or (not os.path.exists(self._output_filepath_str) and not self.metrics.has_calculated_metrics)
 
     def get_log_path(self, type_: str):
-        return self.output_dir_path / f"{self.base_filename}_{type_}_log.txt"
+        return Path(self._path_prefix + "_" + type_ + "_log.txt")
 
     def __eq__(self,
                other: EncodingRun):
-        return str(self.input_sequence.get_filepath()) == str(other.input_sequence.get_filepath()) \
-               and str(self.output_file.get_filepath()) == str(other.output_file.get_filepath())
+        return self._input_filepath_str == other._input_filepath_str \
+               and self._output_filepath_str == other._output_filepath_str
 
     def __hash__(self):
-        return hash(self.input_sequence.get_filepath().name) + hash(self.output_file.get_filepath().name)
+        return self._hash
 
     def __str__(self):
         return f"{self.encoder.get_name()} {self.input_sequence} {self.param_set.get_cl_args()} {self.round_number}"
 
 
 class SubTest:
+    __slots__ = (
+        "parent",
+        "name",
+        "encoder",
+        "param_set",
+        "output_dir_path",
+        "quality_param_short_name",
+        "_scaled_quality_param_values",
+        "_base_filename_prefixes",
+        "_hash",
+    )
 
     def __init__(self,
                  parent: Test,
@@ -106,16 +185,82 @@ class SubTest:
         self.name: str = name
         self.encoder: encoders.EncoderBase = encoder
         self.param_set: encoders.EncoderBase.ParamSet = param_set
+        # The output directory is shared by every encoding run of the subtest.
+        self.output_dir_path: Path = encoder.get_output_dir(param_set, parent.env)
+        self.quality_param_short_name: str = param_set.get_quality_param_type().short_name
+        self._scaled_quality_param_values: dict = {}
+        self._base_filename_prefixes: dict = {}
+        # Hashing the parameter set stringifies the whole command line, so only do it once.
+        self._hash: int = hash((self.encoder, self.param_set))
+
+    def get_scaled_quality_param_value(self,
+                                       sequence: RawVideoSequence):
+        """Returns the quality parameter value scaled for the given sequence.
+        The value only depends on the sequence so it is computed once per sequence."""
+        try:
+            return self._scaled_quality_param_values[sequence]
+        except KeyError:
+            value = _scale_quality_param(self.param_set.get_quality_param_type(),
+                                         self.param_set.get_quality_param_value(),
+                                         sequence)
+            self._scaled_quality_param_values[sequence] = value
+            return value
+
+    def get_base_filename_prefix(self,
+                                 sequence: RawVideoSequence) -> str:
+        """Returns the start of the file names of the encoding runs for the given sequence.
+        Only the round number is appended to it."""
+        try:
+            return self._base_filename_prefixes[sequence][0]
+        except KeyError:
+            base_filename_prefix = "_".join((
+                sequence.get_constructed_name(),
+                self.quality_param_short_name + str(self.param_set.get_quality_param_value()),
+                "",
+            ))
+            path_prefix = os.path.join(str(self.output_dir_path), base_filename_prefix)
+            self._base_filename_prefixes[sequence] = (base_filename_prefix, path_prefix)
+            return base_filename_prefix
+
+    def get_path_prefix(self,
+                        sequence: RawVideoSequence) -> str:
+        """Same as get_base_filename_prefix but including the output directory."""
+        self.get_base_filename_prefix(sequence)
+        return self._base_filename_prefixes[sequence][1]
 
     def __eq__(self,
                other: SubTest):
         return self.encoder == other.encoder and self.param_set == other.param_set
 
     def __hash__(self):
-        return hash(self.encoder) + hash(self.param_set)
+        return self._hash
 
 
 class Test:
+    # The attributes that store the constructor arguments as is, used for cloning.
+    _CONSTRUCTOR_ARGS = (
+        "name",
+        "encoder_type",
+        "encoder_revision",
+        "anchor_names",
+        "cl_args",
+        "encoder_defines",
+        "quality_param_type",
+        "quality_param_list",
+        "seek",
+        "frames",
+        "rounds",
+        "use_prebuilt",
+        "env",
+    )
+
+    __slots__ = _CONSTRUCTOR_ARGS + (
+        "encoder",
+        "new_env",
+        "subtests",
+        "_fingerprint",
+        "_hash",
+    )
 
     def __init__(self,
                  name: str,
@@ -140,9 +285,10 @@ class Test:
         self.encoder: encoders.EncoderBase = self.encoder_type(encoder_revision, encoder_defines, use_prebuilt)
         self.encoder_revision: str = encoder_revision
         self.encoder_defines: Iterable = encoder_defines
-        self.anchor_names: Iterable = anchor_names
+        # Stored as tuples so that one-shot iterables can be iterated more than once.
+        self.anchor_names: tuple = tuple(anchor_names)
         self.quality_param_type: QualityParam = quality_param_type
-        self.quality_param_list: Iterable = quality_param_list
+        self.quality_param_list: tuple = tuple(quality_param_list)
         self.cl_args: str = cl_args
         self.seek: int = seek or 0
         self.frames: int = frames
@@ -152,30 +298,33 @@ class Test:
             self.new_env = None
             self.env = None
         else:
-            temp = dict(os.environ)
-            temp.update(env)
-            self.new_env = temp
+            self.new_env = _merge_env(env)
             self.env = env.copy()
 
-        self.subtests: list = []
-
-        param_sets = [
-            self.encoder.ParamSet(quality_param_type,
-                                  quality_param_value,
-                                  seek,
-                                  frames,
-                                  cl_args)
-            for quality_param_value in quality_param_list
-        ]
-
-        for param_set in param_sets:
-            subtest = SubTest(
+        quality_param_short_name = quality_param_type.short_name
+        # The subtests do not change after construction.
+        self.subtests: tuple = tuple(
+            SubTest(
                 self,
-                f"{name}/{quality_param_type.short_name}{param_set.get_quality_param_value()}",
+                f"{name}/{quality_param_short_name}{quality_param_value}",
                 self.encoder,
-                param_set
+                self.encoder.ParamSet(quality_param_type,
+                                      quality_param_value,
+                                      seek,
+                                      frames,
+                                      cl_args)
             )
-            self.subtests.append(subtest)
+            for quality_param_value in self.quality_param_list
+        )
+
+        # Everything __eq__ compares besides the encoder. The subtests do not change after
+        # construction so this is computed up front. Like ParamSet.__eq__, the quality
+        # parameter is left out of the command lines.
+        self._fingerprint: tuple = (
+            tuple(sorted(self.env.items())) if self.env is not None else None,
+            tuple(subtest.param_set.to_cmdline_str(include_quality_param=False) for subtest in self.subtests),
+        )
+        self._hash: int = hash((hash(self.encoder), self._fingerprint))
 
     def clone(self,
               name: str,
@@ -183,21 +332,22 @@ class Test:
         """Clones a Test object. Kwargs may contain parameter overrides for the constructor call."""
 
         defaults = {
-            attribute_name: getattr(self, attribute_name) for attribute_name in self.__dict__
+            attribute_name: getattr(self, attribute_name) for attribute_name in Test._CONSTRUCTOR_ARGS
         }
-
         defaults["name"] = name
-        for attribute_name, attribute_value in kwargs.items():
-            defaults[attribute_name] = attribute_value
+        defaults.update(kwargs)
 
         return Test(**defaults)
 
     def __eq__(self,
                other: Test):
-        for own, other_ in zip(self.subtests, other.subtests):
-            if other_ != own:
-                return False
-        return self.encoder == other.encoder and self.env == other.env
+        if self is other:
+            return True
+        if not isinstance(other, Test):
+            return NotImplemented
+        return self._hash == other._hash \
+               and self._fingerprint == other._fingerprint \
+               and self.encoder == other.encoder
 
     def __hash__(self):
-        return sum(hash(subtest) for subtest in self.subtests)
+        return self._hash
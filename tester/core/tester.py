@@ -1,9 +1,14 @@
 """This module defines functionality related to testing."""
 import contextlib
+import itertools
+import logging
 import os
+import re
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
+import fnmatch
 from pathlib import Path
 from typing import Iterable, List
 from multiprocessing import Pool, cpu_count
@@ -18,7 +23,7 @@ from tester.core import gcc, ffmpeg, system, vmaf, csv, git, vs, table, conforma
 from tester.core.cfg import Cfg
 from tester.core.log import console_log, log_exception
 from tester.core.metrics import TestMetrics, SequenceMetrics
-from tester.core.test import Test, EncodingRun
+from tester.core.test import Test, SubTest, EncodingRun
 from tester.core.video import RawVideoSequence
 
 
@@ -28,16 +33,128 @@ class ResultTypes(Enum):
     GRAPH = 3
 
 
+# Quality metric -> (CSV fields, table column, graph metric) that need the metric computed.
+_QUALITY_METRICS = {
+    name: (
+        frozenset(csv.CsvField(base_type | value_type) for value_type in csv.CsvFieldValueType),
+        table_column,
+        graph_metric,
+    )
+    for name, base_type, table_column, graph_metric in (
+        ("psnr", csv.CsvFieldBaseType.PSNR, table.TableColumns.PSNR_BDBR, graphs.GraphMetrics.PSNR),
+        ("ssim", csv.CsvFieldBaseType.SSIM, table.TableColumns.SSIM_BDBR, graphs.GraphMetrics.SSIM),
+        ("vmaf", csv.CsvFieldBaseType.VMAF, table.TableColumns.VMAF_BDBR, graphs.GraphMetrics.VMAF),
+    )
+}
+
+
+def _quality_metric_needed(name: str,
+                           result_types: Iterable,
+                           csv_enabled_fields: frozenset,
+                           table_enabled_columns: frozenset,
+                           graph_enabled_metrics: frozenset) -> bool:
+    csv_fields, table_column, graph_metric = _QUALITY_METRICS[name]
+    return (ResultTypes.CSV in result_types and not csv_fields.isdisjoint(csv_enabled_fields)) \
+        or (ResultTypes.TABLE in result_types and table_column in table_enabled_columns) \
+        or (ResultTypes.GRAPH in result_types and graph_metric in graph_enabled_metrics)
+
+
+def _available_cpu_count() -> int:
+    """Returns the number of CPUs the tester is allowed to run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on Windows and macOS.
+        return cpu_count()
+
+
 @contextlib.contextmanager
 def _process_pool(threads=None):
 
     pool = Pool(threads)
 
-    yield pool
-
-    pool.close()
-    pool.join()
-    pool = None
+    try:
+        yield pool
+    except BaseException:
+        # Don't wait for the remaining tasks when something has failed.
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+_GLOB_MAGIC_PATTERN: re.Pattern = re.compile(r"[*?[]")
+
+
+def _scandir_glob(root: str, pattern: str, listings: dict = None):
+    """Expands a glob pattern relative to root, yielding the matching paths as strings.
+    Works like Path.glob but only constructs strings for the entries that actually match
+    and uses the cached type information of os.scandir instead of stat'ing every entry.
+    Directory listings are stored in listings, so passing the same dict to several calls
+    lists every directory only once."""
+    if listings is None:
+        listings = {}
+    parts = [part for part in re.split(r"[\\/]", pattern) if part and part != "."]
+    if parts:
+        yield from _scandir_glob_parts(root, parts, listings)
+
+
+def _scandir_list(directory: str, listings: dict) -> list:
+    """Returns (name, path, is_dir) for the entries of the directory."""
+    try:
+        return listings[directory]
+    except KeyError:
+        pass
+    try:
+        with os.scandir(directory) as entries:
+            listing = [(entry.name, entry.path, entry.is_dir()) for entry in entries]
+    except OSError:
+        listing = []
+    listings[directory] = listing
+    return listing
+
+
+def _scandir_glob_parts(root: str, parts: list, listings: dict):
+    head, rest = parts[0], parts[1:]
+
+    if head == "**":
+        # Matches the directory itself and all of its subdirectories.
+        for directory in _scandir_walk_dirs(root, listings):
+            if rest:
+                yield from _scandir_glob_parts(directory, rest, listings)
+            else:
+                yield directory
+        return
+
+    if not _GLOB_MAGIC_PATTERN.search(head):
+        # A literal component can be checked directly without listing the directory.
+        path = os.path.join(root, head)
+        if not rest:
+            if os.path.exists(path):
+                yield path
+        elif os.path.isdir(path):
+            yield from _scandir_glob_parts(path, rest, listings)
+        return
+
+    listing = _scandir_list(root, listings)
+    # fnmatch.filter compiles the pattern once for the whole listing.
+    matching_names = set(fnmatch.filter([name for name, _, _ in listing], head))
+    for name, path, is_dir in listing:
+        if name not in matching_names:
+            continue
+        if not rest:
+            yield path
+        elif is_dir:
+            yield from _scandir_glob_parts(path, rest, listings)
+
+
+def _scandir_walk_dirs(root: str, listings: dict):
+    yield root
+    for name, path, is_dir in _scandir_list(root, listings):
+        if is_dir and not os.path.islink(path):
+            yield from _scandir_walk_dirs(path, listings)
 
 
 class TesterContext:
@@ -53,20 +170,44 @@ class TesterContext:
 
         self._tests_by_name: dict = {test.name: test for test in self._tests}
 
-        self._input_sequences: list = []
+        # Overlapping globs may match the same file, only one sequence object is created per file.
+        filepaths: list = []
+        seen_filepaths: set = set()
+        sequences_dir = str(Cfg().tester_sequences_dir_path)
+        # Overlapping globs list the same directories, so the listings are shared between them.
+        listings: dict = {}
         for glob in input_sequence_globs:
-            paths = [x for x in Cfg().tester_sequences_dir_path.glob(glob)]
+            paths = [Path(x) for x in _scandir_glob(sequences_dir, glob, listings)]
             if not paths:
                 console_log.error(f"Context: glob \"{glob}\" failed to expand into any sequences")
                 raise RuntimeError
             for filepath in paths:
-                self._input_sequences.append(
-                    RawVideoSequence(
-                        filepath=filepath.resolve(), convert_to=convert_color_format
-                    )
-                )
+                filepath = filepath.resolve()
+                if filepath in seen_filepaths:
+                    console_log.debug(f"Context: Sequence '{filepath}' matched by multiple globs")
+                    continue
+                seen_filepaths.add(filepath)
+                filepaths.append(filepath)
+
+        # Initializing a sequence is mostly waiting for the file system (and ffmpeg if the
+        # sequence is converted), so the sequences are initialized concurrently.
+        self._input_sequences: list = []
+        if filepaths:
+            with ThreadPoolExecutor(max_workers=min(32, len(filepaths))) as executor:
+                futures = [executor.submit(RawVideoSequence, filepath=filepath, convert_to=convert_color_format)
+                           for filepath in filepaths]
+            sequences = [future.result() for future in futures if future.exception() is None]
+            if len(sequences) != len(futures):
+                # The other sequences may already have been converted to temporary files.
+                for sequence in sequences:
+                    if sequence._converted_path:
+                        sequence._converted_path.unlink()
+                next(future for future in futures if future.exception() is not None).result()
+            self._input_sequences = sequences
         self._metrics: dict = {test.name: TestMetrics(test, self._input_sequences) for test in self._tests}
         self._metrics_calculated_for = []
+        # (subtest name, sequence, round) -> encoding run
+        self._encoding_runs: dict = {}
 
     def get_tests(self) -> Iterable:
         return self._tests
@@ -76,12 +217,28 @@ class TesterContext:
 
     def get_test(self,
                  test_name: str) -> Test:
-        assert test_name in self._tests_by_name.keys()
-        return self._tests_by_name[test_name]
+        test = self._tests_by_name.get(test_name)
+        assert test is not None
+        return test
 
     def get_input_sequences(self) -> List[RawVideoSequence]:
         return self._input_sequences
 
+    def get_encoding_run(self,
+                         subtest: SubTest,
+                         sequence: RawVideoSequence,
+                         round_: int) -> EncodingRun:
+        """Returns the encoding run of the given subtest, sequence and round.
+        The runs are created once and shared by run_tests and compute_metrics."""
+        key = (subtest.name, sequence, round_)
+        encoding_run = self._encoding_runs.get(key)
+        if encoding_run is None:
+            test = subtest.parent
+            name = f"{subtest.name}/{sequence.get_filepath().name} ({round_}/{test.rounds})"
+            encoding_run = EncodingRun(subtest, name, round_, test.encoder, subtest.param_set, sequence)
+            self._encoding_runs[key] = encoding_run
+        return encoding_run
+
     def add_metrics_calculated_for(self, type_: ResultTypes):
         self._metrics_calculated_for.append(type_)
 
@@ -91,24 +248,27 @@ class TesterContext:
     def validate_initial(self) -> None:
         """Validates everything that can be validated without the encoder binaries
         having been built."""
-        for test1 in self._tests:
-            for test2 in self._tests:
-                if test1 == test2 and test1 is not test2:
-                    console_log.error(f"Tester: Duplicate tests: "
-                                      f"'{test1.name}', "
-                                      f"'{test2.name}'")
-                    raise RuntimeError
+        # Tests hash consistently with their equality so duplicates can be found with a dict.
+        tests_by_test: dict = {}
+        for test in self._tests:
+            other = tests_by_test.setdefault(test, test)
+            if other is not test:
+                console_log.error(f"Tester: Duplicate tests: "
+                                  f"'{other.name}', "
+                                  f"'{test.name}'")
+                raise RuntimeError
 
-        for test1 in self._tests:
-            for test2 in self._tests:
-                if test1.name == test2.name and test1 is not test2:
-                    console_log.error(f"Tester: Duplicate test name "
-                                      f"'{test1.name}'")
-                    raise RuntimeError
+        tests_by_name: dict = {}
+        for test in self._tests:
+            name = test.name
+            if tests_by_name.setdefault(name, test) is not test:
+                console_log.error(f"Tester: Duplicate test name "
+                                  f"'{name}'")
+                raise RuntimeError
 
         for test in self._tests:
             for anchor_name in test.anchor_names:
-                if anchor_name not in self._tests_by_name.keys():
+                if anchor_name not in self._tests_by_name:
                     console_log.error(f"Tester: Anchor '{anchor_name}' "
                                       f"of test '{test.name}' "
                                       f"does not exist")
@@ -117,12 +277,27 @@ class TesterContext:
     def validate_final(self) -> None:
         """Validates everything that can only be validated once the encoder binaries
         have been built."""
+        # Tests with the same encoder and environment often share parameter sets,
+        # each distinct combination is only validated once.
+        to_validate: dict = {}
         for test in self._tests:
             for subtest in test.subtests:
-                if not subtest.encoder.dummy_run(subtest.param_set, test.new_env):
-                    console_log.error(f"Tester: Test '{test.name}' "
-                                      f"is invalid")
-                    raise RuntimeError
+                key = (subtest.encoder, subtest.param_set.to_cmdline_str(), id(test.new_env))
+                to_validate.setdefault(key, (test, subtest))
+
+        def dummy_run(test_and_subtest) -> bool:
+            test, subtest = test_and_subtest
+            return subtest.encoder.dummy_run(subtest.param_set, test.new_env)
+
+        # The dummy runs mostly wait for the encoder processes, so threads are enough to overlap them.
+        with ThreadPoolExecutor(max_workers=min(_available_cpu_count(), len(to_validate)) or 1) as executor:
+            results = list(executor.map(dummy_run, to_validate.values()))
+
+        for (test, _), valid in zip(to_validate.values(), results):
+            if not valid:
+                console_log.error(f"Tester: Test '{test.name}' "
+                                  f"is invalid")
+                raise RuntimeError
 
     def need_build_support(self):
         return any(not test.use_prebuilt for test in self._tests)
@@ -192,42 +367,90 @@ class Tester:
 
             console_log.info(f"Tester: Building encoders")
             context.validate_initial()
+
+            # Encoders that share a source repository are built one after another since every build
+            # checks out its own revision, but different repositories are built at the same time.
+            tests_by_repository: dict = {}
             for test in context.get_tests():
-                console_log.info(f"Tester: Building encoder for test '{test.name}'")
+                tests_by_repository.setdefault(test.encoder._git_local_path, []).append(test)
+            with ThreadPoolExecutor(max_workers=max(len(tests_by_repository), 1)) as executor:
+                futures = [executor.submit(Tester._build_encoders, tests) for tests in tests_by_repository.values()]
+                for future in as_completed(futures):
+                    future.result()
 
-                if not test.encoder._use_prebuilt and test.encoder.build():
-                    test.encoder.clean()
             context.validate_final()
 
             encoding_runs = []
+            existing_runs = 0
 
             for sequence in context.get_input_sequences():
                 for test in context.get_tests():
                     for subtest in test.subtests:
                         for round_ in range(1, test.rounds + 1):
-                            name = f"{subtest.name}/{sequence.get_filepath().name} ({round_}/{test.rounds})"
-                            encoding_run = EncodingRun(subtest, name, round_, test.encoder, subtest.param_set, sequence)
+                            encoding_run = context.get_encoding_run(subtest, sequence, round_)
                             if encoding_run.needs_encoding:
                                 encoding_runs.append(
                                     encoding_run
                                 )
                             else:
-                                console_log.info(f"{test.name}:"
-                                                 f" File '{encoding_run.output_file.get_filepath().name}'"
-                                                 f" already exists")
-
+                                existing_runs += 1
+                                if console_log.isEnabledFor(logging.DEBUG):
+                                    console_log.debug(f"{test.name}:"
+                                                      f" File '{encoding_run.output_file.get_filepath().name}'"
+                                                      f" already exists")
+
+            # One line per existing encoding floods the log when resuming a large run, so they are summarized.
+            if existing_runs:
+                console_log.info(f"Tester: {existing_runs} encodings already exist, "
+                                 f"{len(encoding_runs)} encodings to run")
+
+            # The thread counts of the encoders are set through their own command line options,
+            # so the tester can not size the runs to the CPUs. Only warn about the obvious case.
+            available_cpus = _available_cpu_count()
+            if parallel_runs > available_cpus:
+                console_log.warning(f"Tester: Running {parallel_runs} encodings in parallel on "
+                                    f"{available_cpus} available CPUs, the encodings compete for the same cores. "
+                                    f"Multithreaded encoders need even fewer parallel runs")
+            if parallel_runs > 1 and encoding_runs:
+                console_log.warning(f"Tester: Running {parallel_runs} encodings in parallel, "
+                                    f"the measured encoding times are affected by the other encodings")
             if parallel_runs > 1:
-                with _process_pool(parallel_runs) as p:
-                    p.imap_unordered(Tester._do_encoding_run, encoding_runs)
+                # The encoders run as subprocesses so threads are enough to keep them busy,
+                # and the encoding runs do not have to be pickled to worker processes.
+                # The largest encodings are started first so that a long one does not
+                # finish alone after the others are done.
+                encoding_runs.sort(key=Tester._encoding_run_size, reverse=True)
+                with ThreadPoolExecutor(max_workers=parallel_runs) as executor:
+                    futures = [executor.submit(Tester._do_encoding_run, encoding_run)
+                               for encoding_run in encoding_runs]
+                    succeeded = [future.result() for future in as_completed(futures)]
             else:
-                for encoding_run in encoding_runs:
-                    Tester._do_encoding_run(encoding_run)
+                succeeded = [Tester._do_encoding_run(encoding_run) for encoding_run in encoding_runs]
 
         except Exception as exception:
             console_log.error(f"Tester: Failed to run tests")
             log_exception(exception)
             exit(1)
 
+        # A failed encoding does not stop the others, so the finished encodings are kept.
+        failed_runs = succeeded.count(False)
+        if failed_runs:
+            console_log.error(f"Tester: {failed_runs} of {len(encoding_runs)} encodings failed")
+            exit(1)
+
+    @staticmethod
+    def _encoding_run_size(encoding_run: EncodingRun) -> int:
+        """Returns the number of pixels encoded, used to estimate how long the run takes."""
+        return encoding_run.frames * encoding_run.input_sequence.get_pixels_per_frame()
+
+    @staticmethod
+    def _build_encoders(tests: list) -> None:
+        for test in tests:
+            console_log.info(f"Tester: Building encoder for test '{test.name}'")
+
+            if not test.encoder._use_prebuilt and test.encoder.build():
+                test.encoder.clean()
+
     @staticmethod
     def compute_metrics(context: TesterContext,
                         parallel_calculations: int = 1,
@@ -241,38 +464,20 @@ class Tester:
             return
 
         values = []
+        failed_runs = 0
         parallel_calculations = max(parallel_calculations, 1)
-        global_psnr = \
-            (
-                    any([csv.CsvField(csv.CsvFieldBaseType.PSNR | value) in Cfg().csv_enabled_fields
-                         for value
-                         in csv.CsvFieldValueType]) and ResultTypes.CSV in result_t
-            ) or (
-                    table.TableColumns.PSNR_BDBR in Cfg().table_enabled_columns and ResultTypes.TABLE in result_t
-            ) or (
-                    graphs.GraphMetrics.PSNR in Cfg().graph_enabled_metrics and ResultTypes.GRAPH in result_t
-            )
-        global_ssim = \
-            (
-                    any([csv.CsvField(csv.CsvFieldBaseType.SSIM | value) in Cfg().csv_enabled_fields
-                         for value
-                         in csv.CsvFieldValueType]) and ResultTypes.CSV in result_t
-            ) or (
-                    table.TableColumns.SSIM_BDBR in Cfg().table_enabled_columns and ResultTypes.TABLE in result_t
-            ) or (
-                    graphs.GraphMetrics.SSIM in Cfg().graph_enabled_metrics and ResultTypes.GRAPH in result_t
-            )
-        global_vmaf = \
-            (
-                    any([csv.CsvField(csv.CsvFieldBaseType.VMAF | value) in Cfg().csv_enabled_fields
-                         for value
-                         in csv.CsvFieldValueType]) and ResultTypes.CSV in result_t
-            ) or (
-                    table.TableColumns.VMAF_BDBR in Cfg().table_enabled_columns and ResultTypes.TABLE in result_t
-            ) or (
-                    graphs.GraphMetrics.VMAF in Cfg().graph_enabled_metrics and ResultTypes.GRAPH in result_t
-            )
-        global_conformance = csv.CsvField.CONFORMANCE in Cfg().csv_enabled_fields and ResultTypes.CSV in result_t
+        cfg = Cfg()
+        # Only used for membership tests, which the configured lists would do linearly.
+        csv_enabled_fields = frozenset(cfg.csv_enabled_fields)
+        table_enabled_columns = frozenset(cfg.table_enabled_columns)
+        graph_enabled_metrics = frozenset(cfg.graph_enabled_metrics)
+        remove_encodings = cfg.remove_encodings_after_metric_calculation
+        global_metrics = [
+            name for name in _QUALITY_METRICS
+            if _quality_metric_needed(name, result_t, csv_enabled_fields, table_enabled_columns, graph_enabled_metrics)
+        ]
+        global_vmaf = "vmaf" in global_metrics
+        global_conformance = csv.CsvField.CONFORMANCE in csv_enabled_fields and ResultTypes.CSV in result_t
         
         if global_vmaf:
             for test in context.get_tests():
@@ -282,35 +487,27 @@ class Tester:
             for test in context.get_tests():
                 for subtest in test.subtests:
                     for round_ in range(1, test.rounds + 1):
-                        name = f"{subtest.name}/{sequence.get_filepath().name} ({round_}/{test.rounds})"
-                        encoding_run = EncodingRun(
-                            subtest,
-                            name,
-                            round_,
-                            test.encoder,
-                            subtest.param_set,
-                            sequence
-                        )
+                        encoding_run = context.get_encoding_run(subtest, sequence, round_)
 
                         metric = encoding_run.metrics
-                        needed_metrics = []
-                        if "psnr" not in metric and global_psnr:
-                            needed_metrics.append("psnr")
-                        if "ssim" not in metric and global_ssim:
-                            needed_metrics.append("ssim")
-                        if "vmaf" not in metric and global_vmaf:
-                            needed_metrics.append("vmaf")
+                        needed_metrics = [name for name in global_metrics if name not in metric]
                         conformance_needed = "conforms" not in metric and global_conformance
                         arguments = (encoding_run, metric, needed_metrics, conformance_needed,
-                                     Cfg().remove_encodings_after_metric_calculation)
+                                     remove_encodings)
                         if parallel_calculations > 1:
                             values.append(arguments)
-                        else:
-                            Tester._calculate_metrics_for_one_run(arguments)
+                        elif not Tester._calculate_metrics_for_one_run(arguments):
+                            failed_runs += 1
+
+        # The metrics are computed by ffmpeg subprocesses so threads are enough to run them concurrently.
+        if parallel_calculations > 1 and values:
+            values.sort(key=lambda arguments: Tester._encoding_run_size(arguments[0]), reverse=True)
+            with ThreadPoolExecutor(max_workers=min(parallel_calculations, len(values))) as executor:
+                failed_runs += sum(not succeeded for succeeded
+                                   in executor.map(Tester._calculate_metrics_for_one_run, values))
 
-        if parallel_calculations > 1:
-            with _process_pool(parallel_calculations) as p:
-                p.imap_unordered(Tester._calculate_metrics_for_one_run, values)
+        if failed_runs:
+            console_log.warning(f"Tester: Failed to compute metrics for {failed_runs} encoding runs")
 
         for m in result_types:
             context.add_metrics_calculated_for(m)
@@ -320,11 +517,23 @@ class Tester:
                 ffmpeg.remove_vmaf_models(test)
 
     @staticmethod
-    def _calculate_metrics_for_one_run(in_args):
+    def _calculate_metrics_for_one_run(in_args) -> bool:
+        """Returns whether the metrics were computed. Errors are logged and not raised
+        so that the other runs can continue."""
         encoding_run, metrics, needed_metrics, conf, remove_encoding = in_args
         try:
             console_log.info(f"Tester: Computing metrics for '{encoding_run.name}'")
 
+            output_filepath = encoding_run.output_file.get_filepath()
+            output_exists = output_filepath.exists()
+            # Everything but the target bitrate is computed from the output, fail before
+            # starting any of it if the output has been removed.
+            if not output_exists \
+                    and (needed_metrics or "bitrate" not in metrics or (conf and "conforms" not in metrics)):
+                console_log.error(f"Tester: Output file '{output_filepath.name}' of '{encoding_run.name}' "
+                                  f"does not exist")
+                return False
+
             if encoding_run.qp_name not in [tester.QualityParam.QP, tester.QualityParam.CRF]:
                 metrics["target_bitrate"] = encoding_run.qp_value
 
@@ -348,8 +557,10 @@ class Tester:
             else:
                 console_log.info(f"Tester: Metrics for '{encoding_run.name}' already exist")
 
-            if encoding_run.output_file.get_filepath().exists() and remove_encoding:
-                os.remove(encoding_run.output_file.get_filepath())
+            if remove_encoding and output_exists:
+                os.remove(output_filepath)
+
+            return True
 
         except Exception as exception:
             console_log.error(f"Tester: Failed to compute metrics for '{encoding_run.name}'")
@@ -357,6 +568,7 @@ class Tester:
                 console_log.error(exception.output.decode())
             log_exception(exception)
             console_log.info(f"Tester: Ignoring error")
+            return False
 
     @staticmethod
     def generate_csv(context: TesterContext,
@@ -368,21 +580,26 @@ class Tester:
         metrics = context.get_metrics()
 
         try:
-            csvfile = csv.CsvFile(filepath=Path(csv_filepath))
-
-            for sequence in context.get_input_sequences():
-                for test in context.get_tests():
-                    for anchor in [context.get_test(name) for name in test.anchor_names]:
-                        for subtest, anchor_subtest in zip(test.subtests, anchor.subtests):
-
-                            try:
-                                csvfile.add_entry(metrics, test, subtest, anchor, anchor_subtest, sequence)
-
-                            except Exception as exception:
-                                console_log.error(f"Tester: Failed to add CSV entry for "
-                                                  f"'{subtest.name}/{sequence.get_filepath().name}'")
-                                log_exception(exception)
-                                console_log.info(f"Tester: Ignoring error")
+            # The anchors and the subtest pairs do not depend on the sequence.
+            subtest_rows = [
+                (test, subtest, anchor, anchor_subtest)
+                for test in context.get_tests()
+                for anchor in [context.get_test(name) for name in test.anchor_names]
+                for subtest, anchor_subtest in zip(test.subtests, anchor.subtests)
+            ]
+
+            with csv.CsvFile(filepath=Path(csv_filepath)) as csvfile:
+                for sequence, (test, subtest, anchor, anchor_subtest) \
+                        in itertools.product(context.get_input_sequences(), subtest_rows):
+
+                    try:
+                        csvfile.add_entry(metrics, test, subtest, anchor, anchor_subtest, sequence)
+
+                    except Exception as exception:
+                        console_log.error(f"Tester: Failed to add CSV entry for "
+                                          f"'{subtest.name}/{sequence.get_filepath().name}'")
+                        log_exception(exception)
+                        console_log.info(f"Tester: Ignoring error")
 
         except Exception as exception:
             console_log.error(f"Tester: Failed to generate CSV file '{csv_filepath}'")
@@ -390,7 +607,9 @@ class Tester:
             exit(1)
 
     @staticmethod
-    def _do_encoding_run(encoding_run: EncodingRun) -> None:
+    def _do_encoding_run(encoding_run: EncodingRun) -> bool:
+        """Returns whether the encoding succeeded. Errors are logged and not raised
+        so that the other encodings can continue."""
 
         console_log.info(f"Tester: Running '{encoding_run.name}'")
 
@@ -405,27 +624,28 @@ class Tester:
                 encoding_run.metrics["encoding_time"] = encoding_time_seconds
             else:
                 console_log.info(f"Tester: Encoding output for '{encoding_run.name}' already exists")
+            return True
 
         except Exception as exception:
             console_log.error(f"Tester: Test failed")
             log_exception(exception)
-            exit(1)
+            return False
 
     @staticmethod
     def _create_base_directories_if_not_exist() -> None:
+        cfg = Cfg()
         for path in [
-            Cfg().tester_binaries_dir_path,
-            Cfg().tester_output_dir_path,
-            Cfg().tester_sources_dir_path
+            cfg.tester_binaries_dir_path,
+            cfg.tester_output_dir_path,
+            cfg.tester_sources_dir_path
         ]:
-            if not path.exists():
-                console_log.debug(f"Tester: Creating directory '{path}'")
-                try:
-                    path.mkdir(parents=True)
-                except Exception as exception:
-                    console_log.error(f"Tester: Failed to create directory '{path}'")
-                    log_exception(exception)
-                    exit(1)
+            # exist_ok avoids a separate existence check and the race between it and the creation.
+            try:
+                path.mkdir(parents=True, exist_ok=True)
+            except Exception as exception:
+                console_log.error(f"Tester: Failed to create directory '{path}'")
+                log_exception(exception)
+                exit(1)
 
     @staticmethod
     def create_tables(context: TesterContext,
@@ -463,22 +683,31 @@ class Tester:
                 'margin-left': "25px",
                 "disable-smart-shrinking": None,
             }
-            pdfkit.from_string(html, filepath, options=options, configuration=config)
+            # Both pages are rendered by their own wkhtmltopdf process, so the process startups
+            # are overlapped by rendering the first page at the same time as the table.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                first_page_future = None
+                if first_page:
+                    a, temp_path = mkstemp()
+                    os.close(a)
+                    first_page_html = \
+                        "\n" \
+                        "<!DOCTYPE html>\n" \
+                        "<html>\n" \
+                        "   <head>\n" \
+                        "   </head>\n" \
+                        "   <body>\n" \
+                        f"       <div> {first_page} </div>\n" \
+                        f"  </body>\n" \
+                        f"</html>\n"
+                    first_page_future = executor.submit(pdfkit.from_string, first_page_html, temp_path,
+                                                        options=options, configuration=config)
+                pdfkit.from_string(html, filepath, options=options, configuration=config)
+                if first_page_future is not None:
+                    first_page_future.result()
 
             merger = PdfFileMerger()
             if first_page:
-                a, temp_path = mkstemp()
-                first_page_html = \
-                    "\n" \
-                    "<!DOCTYPE html>\n" \
-                    "<html>\n" \
-                    "   <head>\n" \
-                    "   </head>\n" \
-                    "   <body>\n" \
-                    f"       <div> {first_page} </div>\n" \
-                    f"  </body>\n" \
-                    f"</html>\n"
-                pdfkit.from_string(first_page_html, temp_path, options=options, configuration=config)
                 merger.append(open(temp_path, "rb"))
 
             merger.append(open(filepath, "rb"), pages=(0, pages))
@@ -515,14 +744,25 @@ class Tester:
         for index, seq in enumerate(seqs):
             figures.append((basedir, context, enabled_metrics, index, metrics, seq))
 
-        if parallel_generations == 1:
-            for fig in figures:
-                Tester._do_one_figure(fig)
-        else:
-            if parallel_generations is None:
-                parallel_generations = cpu_count()
-            with _process_pool(parallel_generations) as p:
-                p.imap_unordered(Tester._do_one_figure, figures)
+        try:
+            if parallel_generations == 1:
+                for fig in figures:
+                    Tester._do_one_figure(fig)
+            else:
+                if parallel_generations is None:
+                    parallel_generations = _available_cpu_count()
+                processes = min(parallel_generations, len(figures)) or 1
+                # Every figure carries the whole context, which pickle only stores once per chunk.
+                chunksize = max(1, len(figures) // (processes * 4))
+                with _process_pool(processes) as p:
+                    # Consumed so that errors in the workers are raised here.
+                    for _ in p.imap_unordered(Tester._do_one_figure, figures, chunksize=chunksize):
+                        pass
+
+        except Exception as exception:
+            console_log.error(f"Tester: Failed to generate RD-graphs in '{basedir}'")
+            log_exception(exception)
+            exit(1)
 
     @staticmethod
     def _do_one_figure(args):
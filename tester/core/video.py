@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import logging
 import math
 import os
 import re
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple
 from subprocess import check_call, DEVNULL
@@ -14,6 +16,28 @@ import tester.core.cfg as cfg
 from tester.core.log import console_log
 
 
+@lru_cache(maxsize=None)
+def _guess_values_from_name(file: str,
+                            sequence_formats: tuple):
+    """The values only depend on the file name and the configured formats, so they are
+    parsed once per sequence even if the sequence is used by several contexts."""
+    for pattern in sequence_formats:
+        temp = re.compile(pattern)
+        match = temp.match(file)
+        if match:
+            result = {
+                "width": int(match.group("width")),
+                "height": int(match.group("height")),
+                "base_name": match.group("name"),
+            }
+            for value in ("fps", "bit_depth", "chroma", "total_frames"):
+                try:
+                    result[value] = int(match.group(value))
+                except (IndexError, TypeError):
+                    pass
+            return result
+
+
 class VideoFileBase:
     """Base class for video files."""
 
@@ -139,11 +163,15 @@ class RawVideoSequence:
 
         self._frames = self._total_frames
         assert self._total_frames
+        # (seek, frame step size) -> frame count
+        self._framecounts: dict = {}
 
         sequence_class = RawVideoSequence.guess_sequence_class(filepath)
 
         self._filepath = filepath
         self._sequence_class: str = sequence_class
+        # Sequences are used as dict keys throughout the tester, so the hash is computed only once.
+        self._hash: int = hash(str(filepath).lower() if cfg.Cfg().system_os_name == "Windows" else str(filepath))
 
         self._converted_path: [None, Path] = None \
             if not convert_to or (self._chroma, bit_depth,) == convert_to \
@@ -161,11 +189,23 @@ class RawVideoSequence:
             if self._chroma == 400 \
             else int(self._width * self._height * 1.5)
         self._bitrate: int = int(self._fps * self._pixels_per_frame * self._bytes_per_pixel * 8)
-
-        console_log.debug(f"{type(self).__name__}: Initialized object:")
-        for attribute_name in sorted(self.__dict__):
-            console_log.debug(f"{type(self).__name__}: "
-                              f"{attribute_name} = {getattr(self, attribute_name)}")
+        # For scaling bitrate targets relative to 1080p.
+        self._resolution_root_scale: float = math.sqrt(self._width * self._height / (1920 * 1080))
+        # Used as the prefix of every output file name of the sequence.
+        self._constructed_name: str = "_".join((
+            str(self._base_name),
+            f"{self._width}x{self._height}",
+            f"{self._fps}fps",
+            f"{self._bit_depth}bit",
+            str(self._chroma),
+        ))
+
+        # Formatting every attribute is wasted work for each sequence unless debug logging is on.
+        if console_log.isEnabledFor(logging.DEBUG):
+            console_log.debug(f"{type(self).__name__}: Initialized object:")
+            for attribute_name in sorted(self.__dict__):
+                console_log.debug(f"{type(self).__name__}: "
+                                  f"{attribute_name} = {getattr(self, attribute_name)}")
 
     def _convert_pixel_fmt(self, to_format):
         cmd = (
@@ -188,8 +228,7 @@ class RawVideoSequence:
         )
 
     def __hash__(self):
-        path = str(self._filepath).lower() if cfg.Cfg().system_os_name == "Windows" else str(self._filepath)
-        return hash(path)
+        return self._hash
 
     def __eq__(self,
                other: VideoFileBase):
@@ -228,11 +267,21 @@ class RawVideoSequence:
     def get_framerate(self) -> int:
         return self._fps
 
+    def get_pixels_per_frame(self) -> int:
+        return self._pixels_per_frame
+
     def get_frames(self, seek=0) -> int:
         return self._frames - seek
 
     def get_framecount(self, seek=0) -> int:
-        return (self._frames - seek + cfg.Cfg().frame_step_size - 1) // cfg.Cfg().frame_step_size
+        frame_step_size = cfg.Cfg().frame_step_size
+        key = (seek, frame_step_size)
+        try:
+            return self._framecounts[key]
+        except KeyError:
+            framecount = (self._frames - seek + frame_step_size - 1) // frame_step_size
+            self._framecounts[key] = framecount
+            return framecount
 
     def get_duration_seconds(self) -> float:
         return self.get_framecount() / self._fps
@@ -240,31 +289,20 @@ class RawVideoSequence:
     def get_bitrate(self) -> float:
         return self._bitrate
 
+    def get_resolution_root_scale(self) -> float:
+        return self._resolution_root_scale
+
     def get_suffixless_name(self):
         return self._filepath.parts[-1].replace(self._filepath.suffix, "")
 
     def get_constructed_name(self):
-        return f"{self._base_name}_{self._width}x{self._height}_{self._fps}fps_{self._bit_depth}bit_{self._chroma}"
+        return self._constructed_name
 
     @staticmethod
     def guess_values(filepath: Path):
-        file = filepath.parts[-1]
-
-        for pattern in cfg.Cfg().sequence_formats:
-            temp = re.compile(pattern)
-            match = temp.match(file)
-            if match:
-                result = {
-                    "width": int(match.group("width")),
-                    "height": int(match.group("height")),
-                    "base_name": match.group("name"),
-                }
-                for value in ("fps", "bit_depth", "chroma", "total_frames"):
-                    try:
-                        result[value] = int(match.group(value))
-                    except (IndexError, TypeError):
-                        pass
-                return result
+        result = _guess_values_from_name(filepath.parts[-1], tuple(cfg.Cfg().sequence_formats))
+        # Copy so that the cached result can not be modified by the caller.
+        return dict(result) if result is not None else None
 
     @staticmethod
     def guess_sequence_class(filepath: Path) -> str:
@@ -31,27 +31,31 @@ class QualityParam(Enum):
 
     @property
     def pretty_name(self):
-        names = {
-            QualityParam.QP: "QP",
-            QualityParam.BITRATE: "bitrate",
-            QualityParam.BPP: "bpp",
-            QualityParam.RES_SCALED_BITRATE: "resolution_scaled_bitrate",
-            QualityParam.RES_ROOT_SCALED_BITRATE: "root_of_resolution_scaled_bitrate",
-            QualityParam.CRF: "CRF",
-        }
-        return names[self]
+        return _QUALITY_PARAM_PRETTY_NAMES[self]
 
     @property
     def short_name(self):
-        names = {
-            QualityParam.QP: "qp",
-            QualityParam.BITRATE: "br",
-            QualityParam.BPP: "bpp",
-            QualityParam.RES_SCALED_BITRATE: "res_br",
-            QualityParam.RES_ROOT_SCALED_BITRATE: "root_br",
-            QualityParam.CRF: "crf",
-        }
-        return names[self]
+        return _QUALITY_PARAM_SHORT_NAMES[self]
+
+
+# The names are looked up for every encoding run so the tables are only built once.
+_QUALITY_PARAM_PRETTY_NAMES = {
+    QualityParam.QP: "QP",
+    QualityParam.BITRATE: "bitrate",
+    QualityParam.BPP: "bpp",
+    QualityParam.RES_SCALED_BITRATE: "resolution_scaled_bitrate",
+    QualityParam.RES_ROOT_SCALED_BITRATE: "root_of_resolution_scaled_bitrate",
+    QualityParam.CRF: "CRF",
+}
+
+_QUALITY_PARAM_SHORT_NAMES = {
+    QualityParam.QP: "qp",
+    QualityParam.BITRATE: "br",
+    QualityParam.BPP: "bpp",
+    QualityParam.RES_SCALED_BITRATE: "res_br",
+    QualityParam.RES_ROOT_SCALED_BITRATE: "root_br",
+    QualityParam.CRF: "crf",
+}
 
 
 class EncoderBase:
@@ -96,6 +100,15 @@ class EncoderBase:
                 f"{'.exe' if tester.Cfg().system_os_name == 'Windows' else ''}")
             self._commit_hash = self._user_given_revision
 
+        # Name of the directory the encoding output goes to, the parts never change after this point.
+        if not self._use_prebuilt:
+            self._output_dir_name: str = f"{self._name.lower()}_{self._commit_hash_short}_{self._define_hash_short}"
+        else:
+            self._output_dir_name: str = f"{self._name.lower()}_{self._commit_hash}"
+
+        # The fields compared in __eq__ are fixed by now, so the hash is only computed once.
+        self._hash: int = hash((self._name, self._commit_hash, self._define_hash))
+
         # This must be set in the constructor of derived classes.
         self._exe_src_path: [Path, None] = None
 
@@ -113,7 +126,7 @@ class EncoderBase:
                and self._define_hash == other._define_hash
 
     def __hash__(self):
-        return hash(self._name) + hash(self._commit_hash) + hash(self._define_hash)
+        return self._hash
 
     def get_pretty_name(self) -> str:
         return self._name.title()
@@ -326,10 +339,12 @@ class EncoderBase:
                      encoding_run: test.EncodingRun) -> bool:
         """Meant to be called as the first thing from the encode() method of derived classes."""
 
-        console_log.debug(f"{self._name}: Encoding file '{encoding_run.input_sequence.get_filepath().name}'")
-        console_log.debug(f"{self._name}: Output: '{encoding_run.output_file.get_filepath().name}'")
-        console_log.debug(f"{self._name}: Arguments: '{encoding_run.param_set.to_cmdline_str()}'")
-        console_log.debug(f"{self._name}: Log: '{encoding_run.get_log_path('encoding').name}'")
+        # Building the messages constructs paths, skip it when debug logging is off.
+        if console_log.isEnabledFor(logging.DEBUG):
+            console_log.debug(f"{self._name}: Encoding file '{encoding_run.input_sequence.get_filepath().name}'")
+            console_log.debug(f"{self._name}: Output: '{encoding_run.output_file.get_filepath().name}'")
+            console_log.debug(f"{self._name}: Arguments: '{encoding_run.param_set.to_cmdline_str()}'")
+            console_log.debug(f"{self._name}: Log: '{encoding_run.get_log_path('encoding').name}'")
 
         if not encoding_run.needs_encoding:
             console_log.info(f"{self._name}: File '{encoding_run.output_file.get_filepath().name}' already exists")
@@ -411,18 +426,13 @@ class EncoderBase:
         return True
 
     def get_output_dir(self, paramset: EncoderBase.ParamSet, env: dict):
+        cfg = tester.Cfg()
         params = paramset.to_cmdline_str(False, include_directory_data=True)
         if env is not None:
             params += " env= " + "".join(f"{x}={y}"for x, y in env.items())
-        if not self._use_prebuilt:
-            base = tester.Cfg().tester_output_dir_path \
-                   / f"{self.get_name().lower()}_{self.get_short_revision()}_" \
-                     f"{self.get_short_define_hash()}"
-        else:
-            base = tester.Cfg().tester_output_dir_path \
-                   / f"{self.get_name().lower()}_{self.get_revision()}"
+        base = cfg.tester_output_dir_path / self._output_dir_name
 
-        if tester.Cfg().system_os_name == "Windows" and len(str(base)) + len(params) > 160:
+        if cfg.system_os_name == "Windows" and len(str(base)) + len(params) > 160:
             md5_params = hashlib.md5(params.encode()).hexdigest()
             md5map_file = base / "hash_to_cmdline.txt"
             hash_in_file = False
@@ -463,6 +473,7 @@ class EncoderBase:
             self._quality_formats: dict = dict()
             """The values defined in this dict MUST include any trailing whitespace or equality operator"""
             self._quality_scales: dict = {x: 1 for x in QualityParam}
+            self._cmdline_strs: dict = {}
 
         def __eq__(self,
                    other: EncoderBase.ParamSet):
@@ -551,7 +562,7 @@ class EncoderBase:
             # Check that no option is specified as both no-<option> and <option>.
             for option_name in args_dict.keys():
                 option_name = option_name.strip("--")
-                if f"--no-{option_name}" in args_dict.keys():
+                if f"--no-{option_name}" in args_dict:
                     raise RuntimeError(f"{type(self).__name__}: Conflicting options '--{option_name}'"
                                        f"and '--no-{option_name}'")
 
@@ -611,8 +622,18 @@ class EncoderBase:
                            include_frames: bool = True,
                            include_directory_data: bool = False, ) -> str:
             """Returns the command line arguments in a string that has been ordered."""
-            return " ".join(
-                self.to_cmdline_tuple(include_quality_param, include_seek, include_frames, include_directory_data))
+            # The string is needed for logging, hashing, comparisons and directory names, so it is
+            # only built once per combination of arguments. The frame step size affects the
+            # directory data.
+            key = (include_quality_param, include_seek, include_frames, include_directory_data,
+                   tester.Cfg().frame_step_size)
+            try:
+                return self._cmdline_strs[key]
+            except KeyError:
+                cmdline_str = " ".join(
+                    self.to_cmdline_tuple(include_quality_param, include_seek, include_frames, include_directory_data))
+                self._cmdline_strs[key] = cmdline_str
+                return cmdline_str
 
         def get_quality_param_type(self) -> QualityParam:
             return self._quality_param_type